@@ -1,14 +1,25 @@
+import math
+import os
+import struct
+
 from mpmath import mp, mpf
 from contextlib import contextmanager
 
-from .util import next_power
+from .util import floor_log
+
+# Set PYFP_ULP_SLOW=1 to compute ulps by search rather than in closed form.
+ULP_SLOW = os.environ.get("PYFP_ULP_SLOW") == "1"
 
 class IEEEFormat:
     def __init__(self, name, bits, exp, prec):
+        self.name = name
         self.bits = bits
         self.exp = exp
         self.prec = prec
         self.bias = 2 ** (self.exp - 1) - 1
+        self.min_exp_norm = -(self.bias - 1)
+        self.min_exp_denorm = self.min_exp_norm - (self.prec - 1)
+        self.ulp_table = dict()
 
     def min_exp(self, denorm=True):
         """
@@ -16,10 +27,9 @@ class IEEEFormat:
 
         If `denorm` is True, include denormalized values.
         """
-        min_exp = -(self.bias - 1)
         if denorm:
-            min_exp -= self.prec - 1
-        return min_exp
+            return self.min_exp_denorm
+        return self.min_exp_norm
 
     def max_exp(self):
         """
@@ -41,6 +51,22 @@ class IEEEFormat:
         """
         return mp.power(2, self.max_exp())
 
+    def ulp_exp(self, k):
+        """
+        Return the unit of least precision for values in the binade [2^k,
+        2^(k+1)).
+
+        Below the normalized range the ulp stays at the smallest denormal.
+
+        Results are cached in `ulp_table`, keyed by `k`.
+        """
+        try:
+            return self.ulp_table[k]
+        except KeyError:
+            exp = max(k - self.prec + 1, self.min_exp_denorm)
+            ulp = self.ulp_table[k] = mp.power(2, exp)
+            return ulp
+
     def ulp(self, x):
         """
         Return the unit of least precision for a value x.
@@ -48,42 +74,128 @@ class IEEEFormat:
         This is the floating point value which represents the delta between
         x and the closest representible number.
         """
-        from .util import zero, one, two
+        if ULP_SLOW:
+            return self._ulp_slow(x)
+
         x = mpf(x)
-        n = 0
+        if not x:
+            return self.min_value()
 
-        min_exp = abs(self.min_exp(denorm=True))
+        k, _ = floor_log(x)
+        return self.ulp_exp(k)
+
+    def _ulp_slow(self, x):
+        """
+        Return ulp(x) by searching for the smallest power of two which
+        changes x when added to it, without using the binary exponent of x.
+
+        The addition rounds towards zero, so 2^k changes x exactly when
+        2^k >= ulp(x). This is only meant as a reference for ulp().
+        """
         with mp.workprec(self.prec):
-            ulp = next_power(x)
-            while (x + ulp) != x and ulp != zero and n < min_exp:
-                ulp /= two
-                n += 1
+            x = abs(mpf(x))
+
+        def changes(k):
+            y = mp.fadd(x, mp.ldexp(1, k), prec=self.prec, rounding='d')
+            return y != x
+
+        lo = self.min_exp_denorm
+        if not x or changes(lo):
+            return mp.ldexp(1, lo)
+
+        # Gallop up from zero to bracket the answer in (lo, hi] ...
+        hi = 0
+        step = 1
+        while not changes(hi):
+            lo = hi
+            hi += step
+            step *= 2
+
+        # ... then bisect it.
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if changes(mid):
+                hi = mid
+            else:
+                lo = mid
+
+        return mp.ldexp(1, hi)
+
+    def ordinal(self, x):
+        """
+        Return the signed index of x among the representable values, where
+        zero has index 0 and each ulp step away from zero adds one.
 
-        return ulp * two
+        The denormals [0, 2^min_exp(denorm=False)) occupy the first
+        2^(prec-1) indices, and each following binade another 2^(prec-1).
+        """
+        with mp.workprec(self.prec):
+            x = mpf(x)
+            if not x:
+                return 0
+
+            k, _ = floor_log(x)
+
+        binades = max(k - self.min_exp_norm, 0)
+        n = binades * 2 ** (self.prec - 1)
+
+        # Index within the binade: |x| / ulp, in exact integer arithmetic so
+        # that it does not depend on the caller's mp.prec. Denormals may
+        # carry bits below the ulp; round those to nearest.
+        shift = x.exp - max(k - self.prec + 1, self.min_exp_denorm)
+        man = abs(x.man)
+        if shift >= 0:
+            n += man << shift
+        else:
+            n += (man + (1 << (-shift - 1))) >> -shift
+        return n if x > 0 else -n
 
     def dist(self, f1, f2):
         """
         Return the distance between two values in ULPs.
         """
-        with mp.workprec(self.prec):
-            lo = mpf(min(f1, f2))
-            hi = mpf(max(f1, f2))
-            dist = 0
-            while lo != hi:
-                lo += self.ulp(lo)
-                dist +=1
+        return abs(self.ordinal(f2) - self.ordinal(f1))
 
-            return dist
+
+class IEEEFormat53(IEEEFormat):
+    """
+    IEEE double precision, with native paths for Python floats.
+
+    Python floats are IEEE doubles, so ulp() and ordinal() can read their
+    exponent and bit pattern directly with math and struct rather than
+    converting to mpf. Any other input takes the generic mpmath path. The
+    results have the same types as for any other format: ulp() returns an
+    mpf and ordinal() an int.
+    """
+
+    def ulp(self, x):
+        if ULP_SLOW or not isinstance(x, float) or not math.isfinite(x):
+            return super().ulp(x)
+
+        if not x:
+            return self.min_value()
+
+        _, e = math.frexp(x)
+        return self.ulp_exp(e - 1)
+
+    def ordinal(self, x):
+        if not isinstance(x, float) or not math.isfinite(x):
+            return super().ordinal(x)
+
+        # Below the sign bit the bit pattern is exactly the ordinal of |x|.
+        n, = struct.unpack('<q', struct.pack('<d', x))
+        return n if n >= 0 else -(n & 0x7fffffffffffffff)
 
 
 ieee_float =     IEEEFormat('single',   32,  8, 24)
-ieee_double =    IEEEFormat('double',   64,  11, 53)
+ieee_double =    IEEEFormat53('double', 64,  11, 53)
 intel_extended = IEEEFormat('extended', 80,  15, 63)
 ieee_quad =      IEEEFormat('quad',     128, 15, 113)
 
 ieee_formats = dict((f.prec, f) for f in (
     ieee_float, ieee_double, intel_extended, ieee_quad
 ))
+ieee_precs = tuple(ieee_formats)
 
 
 def ieee_format(prec=None):
@@ -97,26 +209,38 @@ def ieee_format(prec=None):
     return ieee_formats[prec]
 
 
+# Lookup table for workfloat, accepting either the size in bits or bytes.
+_size_to_prec = dict((f.bits, f.prec) for f in ieee_formats.values())
+_size_to_prec.update((f.bits // 8, f.prec) for f in ieee_formats.values())
+
+
 def ieee_eval(x):
     """
     Return the string representation of a floating point value in each prec.
     """
     x = mpf(x)
     sreps = list()
-    for prec in ieee_formats:
-        with mp.workprec(prec):
+    saved_prec = mp.prec
+    try:
+        for prec in ieee_precs:
+            mp.prec = prec
             sreps.append(str(x))
+    finally:
+        mp.prec = saved_prec
     return sreps
 
 
 @contextmanager
 def workfloat(bytes_or_bits):
-    ok = False
-    bytes_or_bits = int(bytes_or_bits)
-    for fmt in ieee_formats.values():
-        if bytes_or_bits in (fmt.bits, fmt.bits // 8):
-            ok = True
-            with mp.workprec(fmt.prec):
-                yield
-    if not ok:
+    """
+    Temporarily set ``mp.prec`` to the precision of the IEEE format that is
+    `bytes_or_bits` bytes or bits wide.
+
+    :raises KeyError: If no standard format has that size.
+    """
+    prec = _size_to_prec.get(int(bytes_or_bits))
+    if prec is None:
         raise KeyError(bytes_or_bits)
+
+    with mp.workprec(prec):
+        yield
@@ -2,12 +2,134 @@ from mpmath import mp, mpf, workprec
 
 from operator import eq, ne
 
-from .util import zero, one, two
+from .util import zero, one, memoize
 from .ieee import ieee_format
 
 
+def limit_compare(fmt, nulp=0, invert=False):
+    """
+    Return compare(fx, lx) for the limit condition in format `fmt`.
+
+    If `nulp` is zero the condition is ``fx == lx``, otherwise it is
+    ``|fx - lx| <= ulp(fx)``. If `invert` is True the comparison is negated.
+    """
+    if not nulp:
+        return ne if invert else eq
+
+    # Bind the ulp method and abs as defaults: these are fast locals rather
+    # than a closure cell and an attribute lookup on every comparison.
+    if invert:
+
+        def compare(fx, lx, _abs=abs, _ulp=fmt.ulp):
+            return _abs(fx - lx) > _ulp(fx)
+
+    else:
+
+        def compare(fx, lx, _abs=abs, _ulp=fmt.ulp):
+            return _abs(fx - lx) <= _ulp(fx)
+
+    return compare
+
+
+def limit_condition(func, limit, compare):
+    """
+    Return the predicate ``holds(x) = compare(func(x), limit(x))``.
+
+    When `limit` is a value rather than a callable it is converted once and
+    compared directly, so the predicate does not call a wrapper per step.
+    """
+    if callable(limit):
+
+        def holds(x):
+            return compare(func(x), limit(x))
+
+    else:
+        limit_value = mpf(limit)
+
+        def holds(x):
+            return compare(func(x), limit_value)
+
+    return holds
+
+
+def power_steps(xstart, xstop=None, max_steps=None):
+    """
+    Return the number of doublings or halvings from `xstart` to `xstop`,
+    capped at `max_steps`.
+    """
+    if xstop is not None:
+        _, stop_exp = mp.frexp(xstop / xstart)
+        stop_exp = abs(stop_exp - 1)
+        if max_steps is None or stop_exp < max_steps:
+            max_steps = stop_exp
+    if max_steps is None:
+        raise ValueError("one of xstop or max_steps is required")
+    return max_steps
+
+
+def find_power_bisect(func, limit, compare, lo_exp, hi_exp, xstart=None):
+    """
+    Find the first exponent k from `lo_exp` towards `hi_exp` such that
+    ``compare(func(x), limit(x))`` holds for x = xstart * 2^k.
+
+    Bisecting the exponent range takes log2(|hi_exp - lo_exp|) evaluations
+    instead of a linear scan's |hi_exp - lo_exp|, and finds the same k when
+    the predicate is monotone in k (once it holds it keeps holding all the
+    way to `hi_exp`). For other predicates the bisection is only a
+    heuristic: if it never sees the predicate hold, the range is scanned
+    linearly instead, but a predicate which holds on several disjoint runs
+    of k may still give a k other than the first one.
+
+    If `xstart` is not given it defaults to one, so x is exactly 2^k.
+
+    :returns: k
+
+        If the predicate never holds, `hi_exp` is returned without being
+        evaluated, just as a linear scan would stop there. Note that this
+        case costs the full linear scan, |hi_exp - lo_exp| evaluations: for
+        the find_limit* searches that is O(|min_exp|), e.g. 16494
+        evaluations of func for quad.
+    """
+
+    if xstart is None:
+        xstart = one
+
+    holds_at = limit_condition(func, limit, compare)
+
+    def holds(k):
+        return holds_at(mp.ldexp(xstart, k))
+
+    if holds(lo_exp):
+        return lo_exp
+
+    # Invariant: the predicate fails at lo_exp and (is assumed to) hold at
+    # hi_exp, so the answer is in (lo_exp, hi_exp].
+    start_exp, stop_exp = lo_exp, hi_exp
+    found = False
+    while abs(hi_exp - lo_exp) > 1:
+        mid = (lo_exp + hi_exp) // 2
+        if holds(mid):
+            hi_exp = mid
+            found = True
+        else:
+            lo_exp = mid
+
+    if found:
+        return hi_exp
+
+    # The bisection never saw the predicate hold, so hi_exp is unverified:
+    # either it never holds, or it holds only on a run of k the bisection
+    # stepped over. Fall back to scanning.
+    step = 1 if stop_exp > start_exp else -1
+    for k in range(start_exp + step, stop_exp, step):
+        if holds(k):
+            return k
+
+    return stop_exp
+
+
 def find_fp_fast(
-    func, limit, xstart, xstop, xstep, compare, max_steps=None,
+    func, limit, xstart, xstop, xstep, compare, max_steps=None, exp_step=None,
 ):
     """
     Find the first power-of-2 such that |func(x) - limit(x)| <= |eps(x)|.
@@ -28,24 +150,30 @@ def find_fp_fast(
 
     The `prec` temporarily sets overrides ``mp.prec``.
 
+    If `step(x)` is exactly ``x * 2^exp_step`` (doubling or halving), pass
+    `exp_step` as +1 or -1 and the power is found with find_power_bisect
+    rather than by stepping one power at a time.
+
     :returns: (x, n)
 
         Where x === 2^-n and |func(x) - limit(x)| <= |eps(x)|.
     """
 
-    if not callable(limit):
-        limit_value = mpf(limit)
-
-        def limit(x):
-            return limit_value
+    if exp_step is not None:
+        hi_exp = exp_step * power_steps(xstart, xstop, max_steps)
+        k = find_power_bisect(
+            func, limit, compare, 0, hi_exp, xstart=xstart,
+        )
+        return abs(k), mp.ldexp(xstart, k)
 
+    holds = limit_condition(func, limit, compare)
     nsteps = 0
     x = xstart
 
     while (
         (xstop is None or x != xstop)
         and (max_steps is None or nsteps != max_steps)
-        and not compare(func(x), limit(x))
+        and not holds(x)
     ):
         x = xstep(x)
         nsteps += 1
@@ -66,18 +194,12 @@ def find_limit_fast(
         xstop = fmt.min_value()
 
     def xstep(x):
-        return x / two
-
-    if nulp:
+        return mp.ldexp(x, -1)
 
-        def compare(fx, lx):
-            return abs(fx - lx) <= fmt.ulp(fx)
+    compare = limit_compare(fmt, nulp)
 
-    else:
-        compare = eq
-
-    with workprec(prec or mp.prec):
-        return find_fp(
+    with workprec(fmt.prec):
+        return find_fp_fast(
             func,
             limit,
             xstart,
@@ -85,6 +207,7 @@ def find_limit_fast(
             xstep,
             compare,
             max_steps=abs(fmt.min_exp()),
+            exp_step=-1,
         )
 
 
@@ -101,27 +224,48 @@ def find_limit_reverse_fast(
         xstop = one
 
     def xstep(x):
-        return x * two
-
-    if nulp:
+        return mp.ldexp(x, 1)
 
-        def compare(fx, lx):
-            return abs(fx - lx) > fmt.ulp(fx)
+    compare = limit_compare(fmt, nulp, invert=True)
+    min_steps = abs(fmt.min_exp())
 
-    else:
-        compare = ne
-
-    with workprec(prec or mp.prec):
-        steps, value = find_fp(
+    with workprec(fmt.prec):
+        steps, value = find_fp_fast(
             func,
             limit,
             xstart,
             xstop,
             xstep,
             compare,
-            max_steps=abs(fmt.min_exp()),
+            max_steps=min_steps,
+            exp_step=1,
         )
-        return (abs(fmt.min_exp()) - steps + 1), (value / two)
+        return (min_steps - steps + 1), mp.ldexp(value, -1)
+
+
+def bisect_compare(func, limit, compare, lower_limit, upper_limit):
+    """
+    Bisect [lower_limit, upper_limit] for the largest x at which
+    ``compare(func(x), limit(x))`` holds.
+
+    The caller supplies the working precision.
+
+    :returns: (nsteps, x)
+    """
+    holds = limit_condition(func, limit, compare)
+    x = lower_limit
+    last_x = None
+    nsteps = 0
+    while x != last_x and lower_limit != upper_limit:
+        if holds(x):
+            lower_limit = x
+        else:
+            upper_limit = x
+        last_x = x
+        x = mp.ldexp(upper_limit + lower_limit, -1)
+        nsteps += 1
+
+    return nsteps, lower_limit
 
 
 def bisect_limit(
@@ -133,28 +277,10 @@ def bisect_limit(
     if upper_limit is None:
         upper_limit = 2 * lower_limit
 
-    if nulp:
-
-        def compare(fx, lx):
-            return abs(fx - lx) > fmt.ulp(fx)
+    compare = limit_compare(fmt, nulp)
 
-    else:
-        compare = eq
-
-    with workprec(prec or mp.prec):
-        x = lower_limit
-        last_x = None
-        nsteps = 0
-        while x != last_x and lower_limit != upper_limit:
-            if compare(func(x), limit(x)):
-                lower_limit = x
-            else:
-                upper_limit = x
-            last_x = x
-            x = (upper_limit + lower_limit) / 2
-            nsteps += 1
-
-        return nsteps, lower_limit
+    with workprec(fmt.prec):
+        return bisect_compare(func, limit, compare, lower_limit, upper_limit)
 
 
 def find_limit(
@@ -169,29 +295,23 @@ def find_limit(
     if xstop is None:
         xstop = fmt.min_value()
 
-    def xstep(x):
-        return x / two
+    compare = limit_compare(fmt, nulp)
 
-    if nulp:
+    # Share evaluations between the power search and the bisection.
+    func = memoize(func)
+    limit = memoize(limit)
 
-        def compare(fx, lx):
-            return abs(fx - lx) <= fmt.ulp(fx)
-
-    else:
-        compare = eq
-
-    with workprec(prec or mp.prec):
-        n_min, x_n = find_fp(
-            func,
-            limit,
-            xstart,
-            xstop,
-            xstep,
-            compare,
-            max_steps=abs(fmt.min_exp()),
+    with workprec(fmt.prec):
+        max_steps = power_steps(xstart, xstop, abs(fmt.min_exp()))
+        k = find_power_bisect(
+            func, limit, compare, 0, -max_steps, xstart=xstart,
         )
+        n_min = -k
+        x_n = mp.ldexp(xstart, k)
 
-        steps, limit = bisect_limit(func, limit, x_n, x_n * 2, nulp, prec)
+        steps, limit = bisect_compare(
+            func, limit, compare, x_n, mp.ldexp(x_n, 1),
+        )
 
     return limit, n_min, steps
 
@@ -208,29 +328,24 @@ def find_limit_reverse(
     if xstop is None:
         xstop = one
 
-    def xstep(x):
-        return x * two
-
-    if nulp:
+    compare = limit_compare(fmt, nulp)
+    differs = limit_compare(fmt, nulp, invert=True)
+    min_steps = abs(fmt.min_exp())
 
-        def compare(fx, lx):
-            return abs(fx - lx) > fmt.ulp(fx)
+    # Share evaluations between the power search and the bisection.
+    func = memoize(func)
+    limit = memoize(limit)
 
-    else:
-        compare = ne
-
-    with workprec(prec or mp.prec):
-        n_min, x_n = find_fp(
-            func,
-            limit,
-            xstart,
-            xstop,
-            xstep,
-            compare,
-            max_steps=abs(fmt.min_exp()),
+    with workprec(fmt.prec):
+        max_steps = power_steps(xstart, xstop, min_steps)
+        k = find_power_bisect(
+            func, limit, differs, 0, max_steps, xstart=xstart,
         )
+        x_n = mp.ldexp(xstart, k)
 
-        n_min = abs(fmt.min_exp()) - n_min + 1
-        steps, limit = bisect_limit(func, limit, x_n / two, x_n, nulp, prec)
+        n_min = min_steps - k + 1
+        steps, limit = bisect_compare(
+            func, limit, compare, mp.ldexp(x_n, -1), x_n,
+        )
 
     return limit, n_min, steps
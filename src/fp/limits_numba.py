@@ -0,0 +1,142 @@
+"""
+Limits for the platform's native double precision functions.
+
+find_limit_f64 answers the question find_limit answers, but for the
+hardware float64 functions of the platform math library instead of the
+correctly rounded mpmath ones: it runs the same search (exponent bisection
+with a linear fallback, then bracket bisection) entirely on floats. When
+numba is installed the kernels are compiled (and cached on disk);
+otherwise they run as plain Python on floats.
+
+The result is in general *not* the same as ``find_limit(..., prec=53)``,
+and it is not meant to approximate it. Near these limits func(x) and
+limit(x) differ by about half an ulp, exactly where libm is allowed to
+round differently from mpmath, and the degree functions here are computed
+as func(pi * (x / 180)) rather than with a correctly rounded sinpi/cospi.
+The gap depends on the function: for sin and cos the limits agree in n_min
+and differ by thousands to tens of thousands of ulps, while for sind and
+tand they can differ by several percent, or even in n_min.
+"""
+import math
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+
+    def njit(*args, **kwargs):
+        def decorate(func):
+            return func
+
+        return decorate
+
+
+# Function ids.
+COS = 0
+SIN = 1
+COSD = 2
+SIND = 3
+TAND = 4
+
+# Limit ids: limit(x) is limit_val, x, or x * pi / 180.
+LIMIT_CONST = 0
+LIMIT_X = 1
+LIMIT_DEG = 2
+
+# Smallest exponent of a float64 denormal.
+MIN_EXP = -1074
+
+
+@njit(cache=True)
+def eval_f64(func_id, x):
+    if func_id == COS:
+        return math.cos(x)
+    if func_id == SIN:
+        return math.sin(x)
+    if func_id == COSD:
+        return math.cos(math.pi * (x / 180.0))
+    if func_id == SIND:
+        return math.sin(math.pi * (x / 180.0))
+    return math.tan(math.pi * (x / 180.0))
+
+
+@njit(cache=True)
+def limit_f64(limit_id, limit_val, x):
+    if limit_id == LIMIT_CONST:
+        return limit_val
+    if limit_id == LIMIT_X:
+        return x
+    return x * (math.pi / 180.0)
+
+
+@njit(cache=True)
+def ulp_f64(x):
+    if x == 0.0:
+        return math.ldexp(1.0, MIN_EXP)
+    e = math.frexp(x)[1]
+    return math.ldexp(1.0, max(e - 53, MIN_EXP))
+
+
+@njit(cache=True)
+def holds_f64(func_id, limit_id, limit_val, nulp, x):
+    fx = eval_f64(func_id, x)
+    lx = limit_f64(limit_id, limit_val, x)
+    if nulp:
+        return abs(fx - lx) <= ulp_f64(fx)
+    return fx == lx
+
+
+@njit(cache=True)
+def find_limit_f64(func_id, limit_id, limit_val, nulp=0):
+    """
+    Find the float64 limit x_0 of the platform function `func_id` against
+    `limit_id`, searching down from one as find_limit does.
+
+    As in fp.limits.limit_compare, `nulp` is a flag: if it is zero the
+    condition is ``func(x) == limit(x)``, otherwise it is
+    ``|func(x) - limit(x)| <= ulp(func(x))``.
+
+    If the condition holds at no power of two, n_min is 1074 and 2^-1074 is
+    returned untested, as find_power_bisect does.
+
+    :returns: (limit, n_min, steps)
+    """
+    # Bisect the exponent of the largest power of two that holds. As in
+    # find_power_bisect, fall back to a linear scan if the bisection never
+    # sees the condition hold, since it may have stepped over a narrow run.
+    lo = 0
+    hi = MIN_EXP
+    if holds_f64(func_id, limit_id, limit_val, nulp, 1.0):
+        hi = 0
+    else:
+        found = False
+        while lo - hi > 1:
+            mid = (lo + hi) // 2
+            x = math.ldexp(1.0, mid)
+            if holds_f64(func_id, limit_id, limit_val, nulp, x):
+                hi = mid
+                found = True
+            else:
+                lo = mid
+        if not found:
+            for k in range(-1, MIN_EXP, -1):
+                x = math.ldexp(1.0, k)
+                if holds_f64(func_id, limit_id, limit_val, nulp, x):
+                    hi = k
+                    break
+
+    # Bisect [2^hi, 2^(hi+1)] for the largest value that holds.
+    lower = math.ldexp(1.0, hi)
+    upper = lower * 2.0
+    x = lower
+    last_x = -1.0
+    steps = 0
+    while x != last_x and lower != upper:
+        if holds_f64(func_id, limit_id, limit_val, nulp, x):
+            lower = x
+        else:
+            upper = x
+        last_x = x
+        x = (upper + lower) / 2.0
+        steps += 1
+
+    return lower, -hi, steps
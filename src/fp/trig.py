@@ -1,12 +1,26 @@
-from mpmath import mpf, pi, cos, sin, cospi, sinpi, cospi_sinpi
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from mpmath import mp, mpf, pi, cos, sin, cospi, sinpi, cospi_sinpi
 
 from .util import one
 from .limits import find_limit
-from .ieee import ieee_format
+from .ieee import ieee_format, ieee_precs
 
 
 d180 = mpf("180")
-pio180 = pi / d180
+
+
+# pi / 180 must be evaluated at the working precision: a module-level value
+# is stuck at whatever mp.prec was when fp.trig was imported.
+@lru_cache(maxsize=8)
+def _pio180(prec):
+    with mp.workprec(prec):
+        return pi / d180
+
+
+# Kept for existing callers; prefer _pio180(mp.prec) for other precisions.
+pio180 = _pio180(mp.prec)
 
 
 # As x: 1 -> 0, find where cos(x) ~= 1
@@ -38,8 +52,14 @@ def sind(x):
     return sinpi(x / d180)
 
 
+def cosd_sind(x):
+    return cospi_sinpi(x / d180)
+
+
 def tanpi(x):
-    return sinpi(x) / cospi(x)
+    # Share one argument reduction between the sine and cosine.
+    c, s = cospi_sinpi(x)
+    return s / c
 
 
 def tand(x):
@@ -52,7 +72,7 @@ def cosd_small(prec=None):
 
 
 def sind_approx(x):
-    return x * pio180
+    return x * _pio180(mp.prec)
 
 
 # As x -> 0, find where sind(x) ~= x.
@@ -65,3 +85,49 @@ def sind_small(prec=None, nulp=0):
 # As x ->, tand(x) ~= x.
 def tand_small(prec=None, nulp=0):
     return find_limit(tand, sind_approx, prec=prec, nulp=nulp)
+
+
+small_limits = dict(
+    cos=cos_small,
+    sin=sin_small,
+    cosd=cosd_small,
+    sind=sind_small,
+    tand=tand_small,
+)
+
+
+def _small_limit(name, prec):
+    # Unpickling an mpf rounds it to the receiving process's mp.prec, so
+    # send the limit back as its raw, precision-independent _mpf_ tuple.
+    limit, n_min, steps = small_limits[name](prec=prec)
+    return limit._mpf_, n_min, steps
+
+
+def all_small_limits(precs=None, workers=None, names=None):
+    """
+    Run each of the *_small limit finders named in `names` (default: every
+    one in small_limits) at each precision in `precs` (default: every IEEE
+    format), in parallel across `workers` processes.
+
+    Processes are used rather than threads because ``mp.prec`` is global
+    to the interpreter.
+
+    :returns: {(name, prec): (limit, n_min, steps)}
+    """
+    if precs is None:
+        precs = ieee_precs
+
+    if names is None:
+        names = small_limits
+
+    tasks = [(name, prec) for name in names for prec in precs]
+    results = dict()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_small_limit, *task) for task in tasks]
+        for (name, prec), future in zip(tasks, futures):
+            limit, n_min, steps = future.result()
+            with mp.workprec(prec):
+                limit = mp.make_mpf(limit)
+            results[name, prec] = limit, n_min, steps
+
+    return results
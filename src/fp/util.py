@@ -3,12 +3,13 @@ from mpmath import mpf, mp
 zero = mp.zero
 one = mp.one
 two = one + one
+half = one / two
 
 
-def axrange(arg0, *args):
-    """axrange([start, ]stop[, step])
+def axrange_args(arg0, *args):
+    """axrange_args([start, ]stop[, step])
 
-    Iterator version of mpmath.arange.
+    Return (start, stop, step) for the arguments of axrange.
     """
     end = arg0
     start = mpf('0')
@@ -23,19 +24,93 @@ def axrange(arg0, *args):
                 raise TypeError("Too many arguments")
             step = args[1]
 
+    return start, end, step
+
+
+def axrange(arg0, *args):
+    """axrange([start, ]stop[, step])
+
+    Iterator version of mpmath.arange.
+
+    This yields one value at a time, so it suits streaming over very long
+    ranges. To materialize a range use axrange_array, which is much faster.
+    """
+    start, end, step = axrange_args(arg0, *args)
+
     cur = start
     while cur < end:
         yield cur
         cur += step
 
 
+def axrange_array(arg0, *args, dtype='mpf'):
+    """axrange_array([start, ]stop[, step], dtype='mpf')
+
+    Return the values of axrange all at once, as start + i * step.
+
+    With dtype='mpf' this is a list from mpmath.arange. With dtype='float'
+    it is a numpy float64 array from numpy.arange, which requires numpy.
+    """
+    start, end, step = axrange_args(arg0, *args)
+
+    if dtype == 'float':
+        import numpy as np
+
+        return np.arange(float(start), float(end), float(step))
+
+    if dtype != 'mpf':
+        raise ValueError("dtype must be 'mpf' or 'float'")
+
+    return mp.arange(start, end, step)
+
+
+def memoize(func):
+    """
+    Wrap func(x) so that it is evaluated only once per (x, mp.prec).
+
+    Values which are not callable are returned unchanged.
+    """
+    if not callable(func):
+        return func
+
+    cache = dict()
+
+    def memo(x):
+        key = (x, mp.prec)
+        try:
+            return cache[key]
+        except KeyError:
+            fx = cache[key] = func(x)
+            return fx
+
+    return memo
+
+
+def floor_log(x, n=2):
+    """
+    Return (k, exact) where n^k is the largest integer power of n <= |x|, and
+    `exact` is True if |x| == n^k.
+
+    For n == 2 this is read directly from the binary exponent of x, without
+    evaluating a logarithm.
+    """
+    x = abs(x)
+    if n == 2 and x:
+        man, e = mp.frexp(x)
+        return e - 1, man == half
+
+    logn = mp.log(x, n)
+    k = mp.floor(logn)
+    return k, logn == k
+
+
 def next_power(x, n=2):
     """
     Return the value sign(x) * n^k such that n^k is the smallest value > |x|
     for integer k.
     """
-    x = abs(x)
-    return mp.power(n, mp.floor(mp.log(x, n)) + 1)
+    k, _ = floor_log(x, n)
+    return mp.power(n, k + 1)
 
 
 def ceil_power(x, n=2):
@@ -43,11 +118,10 @@ def ceil_power(x, n=2):
     Return the value sign(x) * n^k such that n^k is the smallest value >= |x|
     for integer k.
     """
-    x = abs(x)
-    logn = mp.log(x, n)
-    if logn == mp.floor(logn):
-        return x
-    return mp.power(n, mp.floor(logn) + 1)
+    k, exact = floor_log(x, n)
+    if exact:
+        return abs(x)
+    return mp.power(n, k + 1)
 
 
 def prev_power(x, n=2):
@@ -55,12 +129,11 @@ def prev_power(x, n=2):
     Return the value sign(x) * n^k such that n^k is the largest value < |x|
     for integer k.
     """
-    x = abs(x)
-    logn = mp.log(x, n)
-    if logn == mp.floor(logn):
-        logn -= 1
+    k, exact = floor_log(x, n)
+    if exact:
+        k -= 1
 
-    return mp.power(n, mp.floor(logn))
+    return mp.power(n, k)
 
 
 def floor_power(x, n=2):
@@ -68,5 +141,5 @@ def floor_power(x, n=2):
     Return the value sign(x) * n^k such that n^k is the largest value <= |x|
     for integer k.
     """
-    x = abs(x)
-    return mp.power(n, mp.floor(mp.log(x, n)))
+    k, _ = floor_log(x, n)
+    return mp.power(n, k)
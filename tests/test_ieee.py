@@ -0,0 +1,51 @@
+import random
+
+from mpmath import mp, mpf
+
+from fp.ieee import (
+    IEEEFormat, ieee_float, ieee_double, intel_extended, ieee_quad,
+)
+
+
+def test_dist_readme():
+    assert ieee_float.dist('1.00001001', '1.00001013') == 1
+
+
+def test_dist_wider_than_mp_prec():
+    with mp.workprec(200):
+        quad_1ulp = 1 + mpf(2) ** -112
+        quad_2p52 = 1 + mpf(2) ** -60
+        extended_1ulp = 1 + mpf(2) ** -62
+
+    with mp.workprec(53):
+        assert ieee_quad.dist(1, quad_1ulp) == 1
+        assert ieee_quad.dist(1, quad_2p52) == 2 ** 52
+        assert intel_extended.dist(1, extended_1ulp) == 1
+
+
+def test_ordinal_matches_double_bits():
+    generic = IEEEFormat('double', 64, 11, 53)
+    for x in (1.0, -1.0, 0.1, 5e-324, 2.2250738585072014e-308, 1e308):
+        assert generic.ordinal(mpf(x)) == ieee_double.ordinal(x)
+
+
+def test_ulp_slow_matches_ulp():
+    random.seed(0)
+    for fmt in (ieee_float, ieee_double, intel_extended, ieee_quad):
+        values = [0, 1, 3, '0.1', -7.5, fmt.min_value(), fmt.min_value(False)]
+        values += [random.uniform(-1e6, 1e6) for _ in range(100)]
+        # Denormals and normals across the whole exponent range.
+        values += [
+            mp.ldexp(random.random(), random.randint(fmt.min_exp(), 100))
+            for _ in range(100)
+        ]
+        for x in values:
+            assert fmt._ulp_slow(x) == IEEEFormat.ulp(fmt, x), (fmt.name, x)
+
+
+def test_double_float_path_matches_generic():
+    generic = IEEEFormat('double', 64, 11, 53)
+    for x in (0.0, 1.0, -3.0, 0.1, 5e-324, 2.2250738585072014e-308, 1e308):
+        ulp = ieee_double.ulp(x)
+        assert isinstance(ulp, mpf)
+        assert ulp == generic.ulp(mpf(x)) == ieee_double.ulp(mpf(x))
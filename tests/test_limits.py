@@ -0,0 +1,34 @@
+from operator import eq
+
+from mpmath import mp, sin
+
+from fp.ieee import ieee_format
+from fp.limits import find_fp_fast, bisect_limit, find_limit
+from fp.trig import sind, sind_approx, sind_small, sin_approx
+
+
+def linear_find_limit(func, limit, prec):
+    """find_limit by the original one-power-at-a-time scan."""
+    fmt = ieee_format(prec)
+    with mp.workprec(prec):
+        n_min, x_n = find_fp_fast(
+            func, limit, mp.one, fmt.min_value(), lambda x: x / 2, eq,
+            max_steps=abs(fmt.min_exp()),
+        )
+        steps, x_0 = bisect_limit(func, limit, x_n, x_n * 2, prec=prec)
+    return x_0, n_min, steps
+
+
+def test_find_limit_matches_linear_scan():
+    for prec in (24, 53, 113):
+        assert find_limit(sin, sin_approx, prec=prec) == \
+            linear_find_limit(sin, sin_approx, prec)
+
+
+def test_sind_small_quad():
+    # sind(2^k) == sind_approx(2^k) holds only for k in {-49, -50} here, so
+    # the exponent bisection alone steps right over it.
+    x_0, n_min, steps = sind_small(prec=113)
+    assert (n_min, steps) == (49, 114)
+    assert x_0 == linear_find_limit(sind, sind_approx, 113)[0]
+    assert mp.nstr(x_0, 17) == '2.0130450560183343e-15'
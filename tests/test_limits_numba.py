@@ -0,0 +1,51 @@
+import math
+
+from fp.ieee import ieee_double
+from fp.limits import find_limit
+from fp.limits_numba import (
+    COS, SIN, COSD, SIND, TAND, LIMIT_CONST, LIMIT_X, LIMIT_DEG,
+    find_limit_f64, holds_f64, ulp_f64,
+)
+from fp.trig import cos, sin, one, sin_approx
+
+KERNELS = (
+    (SIN, LIMIT_X, 0.0),
+    (COS, LIMIT_CONST, 1.0),
+    (COSD, LIMIT_CONST, 1.0),
+    (SIND, LIMIT_DEG, 0.0),
+    (TAND, LIMIT_DEG, 0.0),
+)
+
+
+def test_find_limit_f64_is_platform_limit():
+    # The result is the limit of the platform float64 functions: the
+    # condition holds at x_0 and 2^-n_min, but not at the next float or the
+    # next power of two.
+    for kernel in KERNELS:
+        for nulp in (0, 1):
+            x_0, n_min, _ = find_limit_f64(*kernel, nulp)
+            assert 0 < n_min < 1074
+
+            def holds(x):
+                return holds_f64(kernel[0], kernel[1], kernel[2], nulp, x)
+
+            assert holds(x_0)
+            assert not holds(x_0 + ulp_f64(x_0))
+            assert holds(math.ldexp(1.0, -n_min))
+            assert not holds(math.ldexp(1.0, 1 - n_min))
+
+
+def test_find_limit_f64_near_mpmath_for_sin_cos():
+    for kernel, func, limit in (
+        ((SIN, LIMIT_X, 0.0), sin, sin_approx),
+        ((COS, LIMIT_CONST, 1.0), cos, one),
+    ):
+        x_f, n_f, steps_f = find_limit_f64(*kernel)
+        x_0, n_min, steps = find_limit(func, limit, prec=53)
+        assert (n_f, steps_f) == (n_min, steps)
+        assert ieee_double.dist(x_f, x_0) < 2 ** 17
+
+
+def test_find_limit_f64_nulp_is_a_flag():
+    for kernel in KERNELS:
+        assert find_limit_f64(*kernel, 2) == find_limit_f64(*kernel, 1)
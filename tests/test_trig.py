@@ -0,0 +1,38 @@
+import pytest
+from mpmath import mp, mpf
+
+from fp.trig import *
+
+
+def test_pio180_is_a_value():
+    assert isinstance(pio180, mpf)
+    assert mpf(2) * pio180 == mpf(2) * pi / d180
+
+
+def test_sind_approx_uses_working_precision():
+    with mp.workprec(113):
+        assert sind_approx(mp.one) == mp.pi / 180
+
+
+def check_all_small_limits(names, precs):
+    results = all_small_limits(precs=precs, names=names)
+    assert set(results) == set(
+        (name, prec) for name in names for prec in precs
+    )
+    for name in names:
+        for prec in precs:
+            limit, n_min, steps = results[name, prec]
+            expected = small_limits[name](prec=prec)
+            assert limit._mpf_ == expected[0]._mpf_
+            assert (n_min, steps) == expected[1:]
+
+
+def test_all_small_limits_keeps_precision():
+    # Check the wider formats on the finders which find a limit quickly.
+    check_all_small_limits(('cos', 'sin', 'cosd'), (24, 53, 63, 113))
+
+
+@pytest.mark.slow
+def test_all_small_limits_matches_serial():
+    # tand has no limit at 63 and 113 bits, so these scan every power.
+    check_all_small_limits(tuple(small_limits), (24, 53, 63, 113))